@@ -1,7 +1,9 @@
 # -*- coding: utf-8 -*-
 import asyncio
+import re
 import time
 import warnings
+from concurrent.futures import ThreadPoolExecutor
 from urllib.parse import urlparse
 
 import requests
@@ -10,8 +12,10 @@ from selectolax.parser import Node
 
 from uniparser import (Crawler, CrawlerRule, HostRule, JSONRuleStorage,
                        ParseRule, Uniparser)
+from uniparser.config import GlobalConfig
 from uniparser.crawler import RuleNotFoundError
-from uniparser.exceptions import InvalidSchemaError
+from uniparser.exceptions import InvalidSchemaError, UnknownParserNameError
+from uniparser.parsers import BaseParser, compile_regex
 from uniparser.utils import (AiohttpAsyncAdapter, HTTPXAsyncAdapter,
                              HTTPXSyncAdapter, RequestsAdapter,
                              TorequestsAsyncAdapter, TorequestsSyncAdapter,
@@ -153,6 +157,15 @@ def test_context_parser():
     result = uni.context.parse({'a': 1}, 'b', 2)
     # print(result)
     assert result == 2
+    # test parse_chain with context
+    result = uni.parse_chain(None, [['context', 'a', '']], {'a': 1})
+    assert result == 1
+    # test unknown parser name
+    try:
+        uni.parse_chain('', [['unknown', '', '']])
+        raise AssertionError
+    except UnknownParserNameError:
+        pass
 
 
 def test_css_parser():
@@ -233,6 +246,67 @@ def test_css_parser():
     result = uni.css1.parse('<a class="url" href="/">title</a>', 'a.url',
                             '$self')
     assert isinstance(result, Tag)
+    # each rule of the same CrawlerRule parses the input_object again by default
+    html = '<div>a<script>x()</script></div>'
+    crawler_rule = CrawlerRule('test', 'http://example.com', [
+        {
+            'name': 'a',
+            'chain_rules': [['css', 'script', '$self'],
+                            ['udf', '[tag.decompose() for tag in obj]', '']]
+        },
+        {
+            'name': 'b',
+            'chain_rules': [['css', 'div', '$outerHTML']]
+        },
+    ])
+    result = uni.parse(html, crawler_rule)['test']
+    assert result['b'] == ['<div>a<script>x()</script></div>']
+    # rules of the same CrawlerRule share one soup of the input_object with SHARE_PARSE_CACHE
+    GlobalConfig.SHARE_PARSE_CACHE = True
+    try:
+        result = uni.parse(html, crawler_rule)['test']
+        assert result['b'] == ['<div>a</div>']
+        crawler_rule = CrawlerRule('test', 'http://example.com', [
+            {
+                'name': 'a',
+                'chain_rules': [['css', 'a', '$self']]
+            },
+            {
+                'name': 'b',
+                'chain_rules': [['css', 'a', '$self']]
+            },
+        ])
+        # the parses in threads have their own soups
+        with ThreadPoolExecutor(4) as pool:
+            results = list(
+                pool.map(lambda _: uni.parse(HTML, crawler_rule)['test'],
+                         range(8)))
+        for result in results:
+            assert result['a'][1] is result['b'][1]
+        assert results[0]['a'][1] is not results[1]['a'][1]
+        # released even if the CrawlerRule failed
+        failed_rule = CrawlerRule('test', 'http://example.com', [
+            {
+                'name': 'a',
+                'chain_rules': [['css', 'a', '$self']]
+            },
+            {
+                'name': '__schema__',
+                'chain_rules': [['css', 'b', '$text']]
+            },
+        ])
+        try:
+            uni.parse(HTML, failed_rule)
+            raise AssertionError('InvalidSchemaError should be raised')
+        except InvalidSchemaError:
+            pass
+    finally:
+        GlobalConfig.SHARE_PARSE_CACHE = False
+    # bare parse calls never share the soup
+    html = '<a href="/x">x</a><a href="/y">y</a>'
+    for tag in uni.css.parse(html, 'a', '$self'):
+        tag.decompose()
+    assert uni.css.parse(html, 'a', '@href') == ['/x', '/y']
 
 
 def test_selectolax_parser():
@@ -308,6 +382,44 @@ def test_selectolax_parser():
     result = uni.se1.parse('<a class="url" href="/">title</a>', 'a.url',
                            '$innerHTML')
     assert result == 'title', result
+    # each rule of the same CrawlerRule parses the input_object again by default
+    html = '<div>a<script>x()</script></div>'
+    crawler_rule = CrawlerRule('test', 'http://example.com', [
+        {
+            'name': 'a',
+            'chain_rules': [['se', 'script', '$self'],
+                            ['udf', '[node.decompose() for node in obj]', '']]
+        },
+        {
+            'name': 'b',
+            'chain_rules': [['se', 'div', '$outerHTML']]
+        },
+    ])
+    result = uni.parse(html, crawler_rule)['test']
+    assert result['b'] == ['<div>a<script>x()</script></div>']
+    # rules of the same CrawlerRule share one HTMLParser of the input_object with SHARE_PARSE_CACHE
+    html = '<a class="url" href="/">title</a>'
+    crawler_rule = CrawlerRule('test', 'http://example.com', [
+        {
+            'name': 'a',
+            'chain_rules': [['se', 'a', '$self']]
+        },
+        {
+            'name': 'b',
+            'chain_rules': [['se', 'a', '$self']]
+        },
+    ])
+    GlobalConfig.SHARE_PARSE_CACHE = True
+    try:
+        result = uni.parse(html, crawler_rule)['test']
+        assert result['a'][0].parser is result['b'][0].parser
+    finally:
+        GlobalConfig.SHARE_PARSE_CACHE = False
+    # bare parse calls never share the HTMLParser
+    html = '<a href="/x">x</a><a href="/y">y</a>'
+    for node in uni.se.parse(html, 'a', '$self'):
+        node.decompose()
+    assert uni.se.parse(html, 'a', '@href') == ['/x', '/y']
 
 
 def test_xml_parser():
@@ -406,6 +518,24 @@ def test_re_parser():
     result = uni.re.parse('a\t \nb  c', r'b(\s+)', '#0')
     # print(result)
     assert result == 'b  '
+    # test invalid value
+    for value in ['$', '#a', '--', 'b']:
+        result = uni.re.parse('abc', 'b', value)
+        assert isinstance(result, AssertionError)
+        assert isinstance(result.args[0], ValueError)
+    # test compiled pattern cache
+    misses = compile_regex.cache_info().misses
+    for _ in range(3):
+        assert uni.re.parse(['a1', 'b2'], r'\w(\d)', '$1') == [['1'], ['2']]
+    assert compile_regex.cache_info().misses <= misses + 1
+    assert uni.re.get_operation(r'\w(\d)', '$1') is uni.re.get_operation(
+        r'\w(\d)', '$1')
+    # test pre-compiled regex of ParseRule
+    rule = ParseRule('a', [['re', r'\d+', ''], ['re', '(', '']])
+    assert rule['chain_rules'][0][1].code.pattern == r'\d+'
+    assert rule['chain_rules'][1][1].code is None
+    result = uni.parse('a1b22', rule)
+    assert isinstance(result['a'], re.error)
 
 
 def test_jsonpath_parser():
@@ -445,6 +575,42 @@ def test_jsonpath_parser():
     # print(result)
     assert str(result) == "[Fields('firstName')]"
 
+    # each rule of the same CrawlerRule loads the input_object again by default
+    js = '{"items": [1, 2, 3]}'
+    crawler_rule = CrawlerRule('test', 'http://example.com', [
+        {
+            'name': 'a',
+            'chain_rules': [['jsonpath', '$.items', ''],
+                            ['udf', 'obj[0].pop()', '']]
+        },
+        {
+            'name': 'b',
+            'chain_rules': [['jsonpath', '$.items', '']]
+        },
+    ])
+    assert uni.parse(js, crawler_rule)['test']['b'] == [[1, 2, 3]]
+    # rules of the same CrawlerRule share one loaded object of the input_object with SHARE_PARSE_CACHE
+    crawler_rule = CrawlerRule('test', 'http://example.com', [
+        {
+            'name': 'a',
+            'chain_rules': [['jsonpath', '$.address', '']]
+        },
+        {
+            'name': 'b',
+            'chain_rules': [['jsonpath', '$.address', '']]
+        },
+    ])
+    GlobalConfig.SHARE_PARSE_CACHE = True
+    try:
+        result = uni.parse(JSON, crawler_rule)['test']
+        assert result['a'][0] is result['b'][0]
+    finally:
+        GlobalConfig.SHARE_PARSE_CACHE = False
+    # bare parse calls never share the loaded object
+    js = '{"a": [1, 2]}'
+    uni.jmespath.parse(js, 'a', '').append(3)
+    assert uni.jmespath.parse(js, 'a', '') == [1, 2]
+
 
 def test_objectpath_parser():
     uni = Uniparser()
@@ -708,6 +874,42 @@ def parse(item):
     # print(result)
     assert result == 'John'
 
+    # test import check with _ALLOW_IMPORT = False
+    uni.udf._ALLOW_IMPORT = False
+    result = uni.udf.parse(JSON, scode, '')
+    assert isinstance(result, RuntimeError)
+    result = uni.udf.parse('os', '__import__(input_object).sep', '')
+    assert isinstance(result, RuntimeError)
+    # strings of the import names can reach __import__, like __builtins__['__import__']
+    result = uni.udf.parse('', "__builtins__['__import__']('os').sep", '')
+    assert isinstance(result, RuntimeError)
+    result = uni.udf.parse('', "getattr(__builtins__, '__import__')", '')
+    assert isinstance(result, RuntimeError)
+    result = uni.udf.parse(
+        '',
+        "(__builtins__ if isinstance(__builtins__, dict) else vars(__builtins__))[b'__import__'.decode()]('os').sep",
+        '')
+    assert isinstance(result, RuntimeError)
+    # strings containing import may be assembled into __import__
+    result = uni.udf.parse(
+        '', "__builtins__['__' + 'import' + '__']('os').sep", '')
+    assert isinstance(result, RuntimeError)
+    result = uni.udf.parse('', 'f"__{\'import\'}__"', '')
+    assert isinstance(result, RuntimeError)
+    # a variable name containing import is not a import statement
+    result = uni.udf.parse(
+        1, 'important = 1\ndef parse(input_object): return important',
+        '')
+    assert result == 1
+    # test import check of the pre-compiled code
+    rule = ParseRule('a', [['udf', scode, '']])
+    assert rule['chain_rules'][0][1].has_import is True
+    assert isinstance(uni.parse(JSON, rule)['a'], RuntimeError)
+    # the rules loaded again share the same compiled code
+    assert ParseRule('b', [['udf', scode, '']
+                          ])['chain_rules'][0][1] is rule['chain_rules'][0][1]
+    uni.udf._ALLOW_IMPORT = True
+
     # test python code without parse function, using eval
     result = uni.udf.parse('hello', 'input_object + " world."', '')
     # print(result)
@@ -718,6 +920,10 @@ def parse(item):
     # print(result)
     assert result == 'hello world.'
 
+    # test md5 of bytes / str
+    result = uni.udf.parse(b'test', 'md5(obj) == md5(obj.decode())', '')
+    assert result is True
+
     # test custom locals from context
     result = uni.udf.parse('', 'abc', {'locals': {'abc': True}})
     # print(result)
@@ -725,6 +931,10 @@ def parse(item):
 
 def test_loader_parser():
     uni = Uniparser()
+    # json keeps the big int exactly
+    result = uni.loader.parse('{"id": 123456789012345678901234567890}', 'json',
+                              '')
+    assert result == {'id': 123456789012345678901234567890}
     # ===================== test getitem =====================
     # yaml
     result = uni.loader.parse(YAML, 'yaml', '')
@@ -775,6 +985,9 @@ def test_loader_parser():
     result = uni.loader.parse('a', 'b85encode', '')
     # print(result)
     assert uni.loader.parse(result, 'b85decode', '') == 'a'
+    # bytes input_object will not be encoded again
+    assert uni.loader.parse(b'a', 'b64encode', '') == 'YQ=='
+    assert uni.loader.parse([b'YQ==', 'YQ=='], 'b64decode', '') == ['a', 'a']
 
 
 def test_time_parser():
@@ -818,6 +1031,27 @@ def test_time_parser():
     # print(new_result - int(float(timestamp)))
     assert new_result - int(float(timestamp)) == -1 * 3600
 
+    # class level LOCAL_TIME_ZONE change will not be ignored by the cached offset
+    uni = Uniparser()
+    old_time_zone = uni.time.LOCAL_TIME_ZONE
+    old_result = uni.time.parse(time_string, 'encode', '')
+    try:
+        uni.time.__class__.LOCAL_TIME_ZONE = old_time_zone + 1
+        new_result = uni.time.parse(time_string, 'encode', '')
+        assert new_result - old_result == -1 * 3600
+    finally:
+        uni.time.__class__.LOCAL_TIME_ZONE = old_time_zone
+    assert uni.time.parse(time_string, 'encode', '') == old_result
+    # the fast path of common formats is the same as strptime, invalid values still raise ValueError
+    for value in ['2020-02-29 20:29:45', '2020-12-31T23:59:59']:
+        fmt = '%Y-%m-%dT%H:%M:%S' if 'T' in value else '%Y-%m-%d %H:%M:%S'
+        assert uni.time.parse(value, 'encode',
+                              fmt) == time.mktime(time.strptime(value, fmt))
+    for value in [
+            '2021-02-29 20:29:45', '2020-13-01 20:29:45', '0000-01-01 00:00:00'
+    ]:
+        assert isinstance(uni.time.parse(value, 'encode', ''), ValueError)
+
 
 def test_crawler_rule():
     # Simple usage of Uniparser and CrawlerRule
@@ -877,6 +1111,104 @@ def test_crawler_rule():
     assert host_rule.findall('https://importpython.com/')
 
 
+def test_custom_parser():
+
+    class CustomParser(BaseParser):
+        name = 'custom_test'
+
+        def _parse(self, input_object, param, value):
+            return 'old'
+
+    assert Uniparser().custom_test.parse('', '', '') == 'old'
+
+    class NewCustomParser(BaseParser):
+        name = 'custom_test'
+
+        def _parse(self, input_object, param, value):
+            return 'new'
+
+    # the first class of the same name wins, in the order of __subclasses__()
+    uni = Uniparser()
+    assert uni.custom_test.parse('', '', '') == 'old'
+    assert NewCustomParser in uni.parser_classes
+
+
+def test_host_rule():
+    host_rule = HostRule('example.com')
+    for name, regex in [
+        ('list', r'^https://example\.com/list/(\d+)$'),
+        ('detail', r'^https://example\.com/detail/\d+$'),
+        ('all', r'^https://example\.com/'),
+    ]:
+        host_rule.add_crawler_rule(
+            CrawlerRule(name, f'https://example.com/{name}/1', regex=regex))
+    assert host_rule.get_combined_regex()[0] is not None
+    assert [rule['name'] for rule in host_rule.findall('https://example.com/')
+           ] == ['all']
+    assert [
+        rule['name']
+        for rule in host_rule.findall('https://example.com/detail/1')
+    ] == ['detail', 'all']
+    assert [
+        rule['name'] for rule in host_rule.findall(
+            'https://example.com/list/1', 'search')
+    ] == ['list', 'all']
+    assert not host_rule.findall('https://example.org/detail/1')
+    try:
+        host_rule.find('https://example.com/list/1')
+        raise AssertionError
+    except ValueError:
+        pass
+    host_rule.pop_crawler_rule('all')
+    assert host_rule.find('https://example.com/list/1')['name'] == 'list'
+    assert host_rule.find('https://example.com/') is None
+    # the combined regex follows the direct changes of crawler_rules
+    host_rule['crawler_rules']['detail']['regex'] = r'^https://example\.com/d/\d+$'
+    assert host_rule.find('https://example.com/detail/1') is None
+    assert host_rule.find('https://example.com/d/1')['name'] == 'detail'
+    host_rule['crawler_rules']['item'] = CrawlerRule(
+        'item', 'https://example.com/item/1',
+        regex=r'^https://example\.com/item/\d+$')
+    assert host_rule.find('https://example.com/item/1')['name'] == 'item'
+    host_rule.pop_crawler_rule('item')
+    # numbered backreference can not be combined, fallback to check one by one
+    host_rule.add_crawler_rule(
+        CrawlerRule('ref', 'https://example.com/a/a',
+                    regex=r'^https://example\.com/(\w)/\1$'))
+    assert host_rule.get_combined_regex()[0] is None
+    assert host_rule.find('https://example.com/a/a')['name'] == 'ref'
+    assert host_rule.find('https://example.com/a/b') is None
+    # the compiled regexes checked one by one are not a stale snapshot
+    host_rule['crawler_rules']['ref']['regex'] = r'^https://example\.com/(\w)/\1/$'
+    assert host_rule.get_combined_regex()[0] is None
+    assert host_rule.find('https://example.com/a/a') is None
+    assert host_rule.find('https://example.com/a/a/')['name'] == 'ref'
+    # sub classes of CrawlerRule keep their own CHECK_STRATEGY
+
+    class SearchRule(CrawlerRule):
+        CHECK_STRATEGY = 'search'
+
+    host_rule = HostRule('example.com')
+    host_rule.add_crawler_rule(
+        SearchRule('search', 'https://example.com/x/a', regex='/x/'))
+    assert host_rule.find('https://example.com/x/a')['name'] == 'search'
+    assert host_rule.find('https://example.com/x/a', 'match') is None
+
+    # the explicit strategy is checked by the methods of the sub classes too
+
+    class SuffixRule(CrawlerRule):
+
+        def match(self, url):
+            return url.endswith(self['regex'])
+
+    host_rule = HostRule('example.com')
+    host_rule.add_crawler_rule(
+        SuffixRule('suffix', 'https://example.com/p/1', regex='/p/1'))
+    assert host_rule.find('https://example.com/p/1', 'match')['name'] == 'suffix'
+    assert host_rule.match('https://example.com/p/1')['name'] == 'suffix'
+    assert host_rule.match('https://example.com/q/1') is None
+
+
 def test_default_usage():
     # 1. prepare for storage to save {'host': HostRule}
     uni = Uniparser()
@@ -1034,6 +1366,9 @@ def test_uni_parser():
     # yapf: disable
     assert result == {'test_iter_parse': [{'child': 2}, {'child': 4}, {'child': 6}]}
     # yapf: enable
+    # aparse gives the same result as parse for iter_parse_child
+    assert asyncio.get_event_loop().run_until_complete(
+        uni.aparse([1, 2, 3], parse_rule)) == result
     parse_rule = ParseRule(
         'test_iter_parse', [['python', 'const', '']],
         child_rules=[ParseRule('child', [['udf', 'input_object * 2', '']])])
@@ -1222,6 +1557,80 @@ def test_async_adapters():
     asyncio.get_event_loop().run_until_complete(_a_test())
 
 
+def test_aclose():
+
+    async def _a_test():
+        for adapter_class, closed in ((HTTPXAsyncAdapter, 'is_closed'),
+                                      (AiohttpAsyncAdapter, 'closed')):
+            uni = Uniparser(request_adapter=adapter_class())
+            async with uni.request_adapter:
+                pass
+            await uni.aclose()
+            # the closed adapter will not be reused
+            assert uni.request_adapter is None
+            assert uni.ensure_adapter(sync=False) is not None
+            # the closed adapter opens a new session
+            adapter = adapter_class()
+            async with adapter as req:
+                session = req.session
+            await adapter.close()
+            async with adapter as req:
+                assert req.session is not session
+                assert not getattr(req.session, closed)
+            await adapter.close()
+
+    asyncio.get_event_loop().run_until_complete(_a_test())
+
+
+def test_acrawl_many():
+    # non-http request_args will be the input_object without downloading
+    uni = Uniparser()
+    crawler_rules = [
+        CrawlerRule(f'rule{i}', {'url': f'file://{i}'}, [{
+            'name': 'url',
+            'chain_rules': [['udf', 'input_object["url"]', '']]
+        }]) for i in range(3)
+    ]
+    results = asyncio.get_event_loop().run_until_complete(
+        uni.acrawl_many(crawler_rules, concurrency=2))
+    assert results == [{
+        f'rule{i}': {
+            'url': f'file://{i}'
+        }
+    } for i in range(3)]
+    # the same rule with different requests, each one has its own context
+    crawler_rule = CrawlerRule('rule', {'url': 'file://0'}, [
+        {
+            'name': 'a',
+            'chain_rules': [['udf', 'context["request_args"]["url"]', '']]
+        },
+        {
+            'name': 'b',
+            'chain_rules': [['udf', 'sum(range(100000))', '']]
+        },
+        {
+            'name': 'c',
+            'chain_rules': [[
+                'udf',
+                'context["parse_result"]["a"] + context["request_args"]["url"]',
+                ''
+            ]]
+        },
+    ])
+    items = [crawler_rule] * 3 + [(crawler_rule, {
+        'url': f'file://{i}'
+    }) for i in range(1, 11)]
+    results = asyncio.get_event_loop().run_until_complete(
+        uni.acrawl_many(items))
+    assert results == [{
+        'rule': {
+            'a': f'file://{i}',
+            'b': 4999950000,
+            'c': f'file://{i}' * 2
+        }
+    } for i in [0, 0, 0] + list(range(1, 11))]
+
+
 def test_crawler_storage():
     crawler = Crawler()
     crawler_rule = CrawlerRule(
@@ -1412,7 +1821,11 @@ if __name__ == "__main__":
             test_time_parser,
             test_uni_parser,
             test_crawler_rule,
+            test_custom_parser,
+            test_host_rule,
             test_default_usage,
+            test_aclose,
+            test_acrawl_many,
             test_crawler_storage,
             test_uni_parser_frequency,
             test_crawler,
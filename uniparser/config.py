@@ -5,10 +5,14 @@ class GlobalConfig:
     GLOBAL_TIMEOUT = 60
     # system errors, will not be handled
     SYSTEM_ERRORS = (KeyboardInterrupt, OSError, SystemExit)
-    # can be set as orjson / ujson
+    # can be set as orjson / ujson, such as `GlobalConfig.json_loads = orjson.loads`
+    # stdlib json is the default: orjson turns the ints beyond 64 bits into float silently
     JSONDecodeError = JSONDecodeError
     json_dumps = dumps
     json_loads = loads
+    # rules of the same CrawlerRule share the soup / loaded JSON of the same input_object, each rule parses it again by default.
+    # the shared objects are mutable, so only turn it on if no rule changes them, like udf with Tag.decompose()
+    SHARE_PARSE_CACHE = False
     # ensure the result is True
     __schema__ = '__schema__'
     # fetch a new request
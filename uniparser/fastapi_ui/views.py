@@ -10,14 +10,23 @@ from traceback import format_exc
 from fastapi import FastAPI
 from fastapi.staticfiles import StaticFiles
 from starlette.requests import Request
-from starlette.responses import JSONResponse
+from starlette.responses import HTMLResponse, JSONResponse
 from starlette.templating import Jinja2Templates
 
 from .. import CrawlerRule, Uniparser, __version__
-from ..utils import (GlobalConfig, InputCallbacks, ensure_await_result,
-                     ensure_request, get_available_async_request)
+from ..utils import (GlobalConfig, InputCallbacks, check_import,
+                     ensure_await_result, ensure_request,
+                     get_available_async_request)
 
-app = FastAPI(title="Uniparser", version=__version__)
+if check_import('orjson'):
+    # faster serializer for the responses, pip install orjson
+    from fastapi.responses import ORJSONResponse as DefaultResponse
+else:
+    DefaultResponse = JSONResponse
+
+app = FastAPI(title="Uniparser",
+              version=__version__,
+              default_response_class=DefaultResponse)
 logger = getLogger('uniparser')
 adapter = get_available_async_request()
 if not adapter:
@@ -38,10 +47,13 @@ cdn_urls = GlobalConfig.cdn_urls
 async def exception_handler(request: Request, exc: Exception):
     trace_id = str(int(time() * 1000))
     err_name = exc.__class__.__name__
-    err_value = str(exc)
-    msg = f'{err_name}({err_value}) trace_id: {trace_id}:\n{format_exc()}'
-    logger.error(msg)
-    return JSONResponse(
+    # traceback will be formatted only if the log record is emitted
+    logger.error('%s(%s) trace_id: %s:',
+                 err_name,
+                 exc,
+                 trace_id,
+                 exc_info=(type(exc), exc, exc.__traceback__))
+    return DefaultResponse(
         status_code=500,
         content={
             "message": f"Oops! {err_name}.",
@@ -50,8 +62,8 @@ async def exception_handler(request: Request, exc: Exception):
     )
 
 
-@app.get("/")
-def index(request: Request):
+def render_index_html():
+    """The index page only depends on the configs, the parsers and the InputCallbacks."""
     parser_name_docs = {
         name: parser.__doc__
         for name, parser in uni.parsers_all.items()
@@ -67,17 +79,28 @@ def index(request: Request):
     }
     init_vars_b64 = b64encode(
         GlobalConfig.json_dumps(init_vars).encode('u8')).decode('u8')
-    return templates.TemplateResponse(
-        'index.html',
-        dict(cdn_urls=cdn_urls,
-             version=__version__,
-             FAVICON=GlobalConfig.FAVICON,
-             init_vars_b64=init_vars_b64,
-             request=request))
+    return templates.get_template('index.html').render(
+        cdn_urls=cdn_urls,
+        version=__version__,
+        FAVICON=GlobalConfig.FAVICON,
+        init_vars_b64=init_vars_b64)
+
+
+@app.on_event("startup")
+def prepare_index_html():
+    # render once the server starts, after the custom parsers / InputCallbacks are registered
+    app.state.index_html = render_index_html()
+
+
+@app.get("/")
+def index():
+    return HTMLResponse(app.state.index_html)
 
 
 @app.post("/request")
-async def send_request(request_args: dict):
+async def send_request(request: Request):
+    # load the body directly, skip the validation of pydantic
+    request_args = GlobalConfig.json_loads(await request.body())
     rule = CrawlerRule(**request_args)
     regex = rule['regex']
     url = rule['request_args']['url']
@@ -86,10 +109,12 @@ async def send_request(request_args: dict):
     else:
         msg = ''
     input_object, resp = await uni.adownload(rule)
+    # build the new context before replacing, no await between clear and update
+    context = await ensure_await_result(GlobalConfig.init_context())
+    context['request_args'] = rule['request_args']
+    context['resp'] = resp
     CONTEXT.clear()
-    CONTEXT.update(await ensure_await_result(GlobalConfig.init_context()))
-    CONTEXT['request_args'] = rule['request_args']
-    CONTEXT['resp'] = resp
+    CONTEXT.update(context)
     headers = getattr(resp, 'headers', {})
     text = str(input_object)
     content_length = headers.get('Content-Length', len(text))
@@ -112,13 +137,15 @@ async def curl_parse(request: Request):
 
 
 @app.post("/parse")
-async def parse_rule(kwargs: dict):
+async def parse_rule(request: Request):
+    kwargs = GlobalConfig.json_loads(await request.body())
     input_object = kwargs['input_object']
     rule_json = kwargs['rule']
     json_result = ""
     try:
         rule = CrawlerRule.loads(rule_json)
-        result = await uni.aparse(input_object, rule, context=CONTEXT)
+        # shallow copy, concurrent parsing will not share the parse_result
+        result = await uni.aparse(input_object, rule, context=dict(CONTEXT))
         try:
             json_result = GlobalConfig.json_dumps(result,
                                                   default=repr,
@@ -1,17 +1,23 @@
 # -*- coding: utf-8 -*-
 
+import ast
 import asyncio
 import re
+import threading
 from abc import ABC, abstractmethod
-from base64 import (b16decode, b16encode, b32decode, b32encode, b64decode,
-                    b64encode, b85decode, b85encode)
+from base64 import (b16decode, b16encode, b32decode, b32encode, b85decode,
+                    b85encode)
 from copy import deepcopy
+from functools import lru_cache, partial
 from hashlib import md5 as _md5
 from itertools import chain
 from logging import getLogger
+from operator import attrgetter, methodcaller
 from re import compile as re_compile
 from string import Template
+from sys import intern
 from time import localtime, mktime, strftime, strptime, timezone
+from types import GeneratorType
 from typing import Any, Callable, Dict, List, Union
 
 from .config import GlobalConfig
@@ -22,6 +28,18 @@ from .utils import (AsyncRequestAdapter, InputCallbacks, NullContext,
                     get_available_async_request, get_available_sync_request,
                     get_host, to_thread)
 
+try:
+    from contextvars import ContextVar
+except ImportError:
+    # python3.6
+    ContextVar = None
+
+try:
+    # pybase64 is a SIMD drop-in replacement of base64 (optional)
+    from pybase64 import b64decode, b64encode
+except ImportError:
+    from base64 import b64decode, b64encode
+
 __all__ = [
     'BaseParser', 'ParseRule', 'CrawlerRule', 'HostRule', 'CSSParser',
     'SelectolaxParser', 'XMLParser', 'RegexParser', 'JSONPathParser',
@@ -46,14 +64,119 @@ def md5(string, n=32, encoding="utf-8", skip_encode=False):
     '923820dcc5'
     >>> md5('test')
     '098f6bcd4621d373cade4e832627b4f6'
+    >>> md5(b'test')
+    '098f6bcd4621d373cade4e832627b4f6'
     """
-    todo = string if skip_encode else str(string).encode(encoding)
+    if skip_encode or isinstance(string, bytes):
+        todo = string
+    elif isinstance(string, str):
+        todo = string.encode(encoding)
+    else:
+        todo = str(string).encode(encoding)
+    result = _md5(todo).hexdigest()
     if n == 32:
-        return _md5(todo).hexdigest()
+        return result
     elif isinstance(n, (int, float)):
-        return _md5(todo).hexdigest()[(32 - n) // 2:(n - 32) // 2]
+        return result[(32 - n) // 2:(n - 32) // 2]
     elif isinstance(n, (tuple, list)):
-        return _md5(todo).hexdigest()[n[0]:n[1]]
+        return result[n[0]:n[1]]
+
+
+@lru_cache(maxsize=2048)
+def compile_regex(pattern):
+    """re.compile with a larger cache, skip the re module cache lookup."""
+    return re_compile(pattern)
+
+
+@lru_cache()
+def get_soup_builder(features):
+    """Lookup the TreeBuilder class of BeautifulSoup only once for each features, None if not found."""
+    return _lib.builder_registry.lookup(features)
+
+
+@lru_cache(maxsize=2048)
+def compile_css(selector, namespaces=()):
+    """soupsieve.compile only once for each selector, namespaces is a tuple of (prefix, uri)."""
+    return _lib.soupsieve_compile(selector, dict(namespaces))
+
+
+def get_css_selector(tag, selector):
+    """Compiled selector with the namespaces of the tag, same as Tag.select does."""
+    namespaces = getattr(tag, '_namespaces', None)
+    return compile_css(selector,
+                       tuple(namespaces.items()) if namespaces else ())
+
+
+def make_soup(markup, features):
+    """BeautifulSoup(markup, features) without the TreeBuilder lookup for each call."""
+    # new builder instance will be created by bs4, which is not thread-safe to be shared
+    return _lib.BeautifulSoup(markup,
+                              features,
+                              builder=get_soup_builder(features))
+
+
+class _ThreadLocalVar(threading.local):
+    """ContextVar-like get / set for python3.6, only visible in the same thread."""
+    value = None
+
+    def get(self):
+        return self.value
+
+    def set(self, value):
+        self.value = value
+
+
+# {parser: (input_object, parsed_object)} while Uniparser is parsing a CrawlerRule with GlobalConfig.SHARE_PARSE_CACHE, else None.
+# Scoped for each thread / task (copied into to_thread), never shared by the concurrent parses.
+_PARSE_CACHE = ContextVar('uniparser_parse_cache',
+                          default=None) if ContextVar else _ThreadLocalVar()
+
+
+def open_parse_cache():
+    """Start the parse cache for the current thread / task if GlobalConfig.SHARE_PARSE_CACHE, return False if it is off or already started by the outer parse."""
+    if not GlobalConfig.SHARE_PARSE_CACHE or _PARSE_CACHE.get() is not None:
+        return False
+    _PARSE_CACHE.set({})
+    return True
+
+
+def close_parse_cache(opened):
+    """Release the parse cache started by open_parse_cache."""
+    if opened:
+        _PARSE_CACHE.set(None)
+
+
+def get_cached_soup(parser, markup, factory=None):
+    """make_soup with parser.features (or factory(markup)), reuse the last soup if the same str / bytes object comes again.
+
+    The markup is kept with the soup, so the identity check will never be fooled by a reused id.
+    Only enabled while Uniparser is parsing a CrawlerRule with GlobalConfig.SHARE_PARSE_CACHE (see open_parse_cache),
+    bare parser.parse calls always get a new soup."""
+    cache = _PARSE_CACHE.get()
+    if cache is None or not isinstance(markup, (str, bytes)):
+        return factory(markup) if factory else make_soup(
+            markup, parser.features)
+    last_soup = cache.get(parser)
+    if last_soup and last_soup[0] is markup:
+        return last_soup[1]
+    soup = factory(markup) if factory else make_soup(markup, parser.features)
+    cache[parser] = (markup, soup)
+    return soup
+
+
+def get_cached_json(parser, text):
+    """GlobalConfig.json_loads, reuse the last loaded object if the same str object comes again, like get_cached_soup.
+
+    Only enabled while Uniparser is parsing a CrawlerRule with GlobalConfig.SHARE_PARSE_CACHE."""
+    cache = _PARSE_CACHE.get()
+    if cache is None:
+        return GlobalConfig.json_loads(text)
+    last_json = cache.get(parser)
+    if last_json and last_json[0] is text:
+        return last_json[1]
+    result = GlobalConfig.json_loads(text)
+    cache[parser] = (text, result)
+    return result
 
 
 class BaseParser(ABC):
@@ -90,12 +213,17 @@ class BaseParser(ABC):
     def _parse(self, input_object, param, value):
         pass
 
+    def _parse_batch(self, input_list, param, value):
+        """Parse each item of the list while _RECURSION_LIST is True.
+        Overwrite it if some work of param & value can be done only once for the whole list."""
+        _parse = self._parse
+        return [_parse(item, param, value) for item in input_list]
+
     def parse(self, input_object, param, value):
         try:
-            if isinstance(input_object, list) and self._RECURSION_LIST:
-                return [
-                    self._parse(item, param, value) for item in input_object
-                ]
+            # list subclasses (like bs4 ResultSet) should be recursion parsed too, so not `type() is list`
+            if self._RECURSION_LIST and isinstance(input_object, list):
+                return self._parse_batch(input_object, param, value)
             else:
                 return self._parse(input_object, param, value)
         except GlobalConfig.SYSTEM_ERRORS:
@@ -149,18 +277,21 @@ class CSSParser(BaseParser):
             ['<a class="url" href="/">title</a>', 'a.url', '$string']    => ['<a class="url" href="/">title</a>']
             ['<a class="url" href="/">title</a>', 'a.url', '$self']      => [<a class="url" href="/">title</a>]
 
-            WARNING: $self returns the original Tag object
+            WARNING: $self returns the original Tag object, which is shared by the rules of the same CrawlerRule if GlobalConfig.SHARE_PARSE_CACHE
     """
     name = 'css'
     doc_url = 'https://developer.mozilla.org/en-US/docs/Web/CSS/CSS_Selectors'
     installed = check_import('bs4')
+    # features of BeautifulSoup, lxml is much faster than html.parser
+    features = 'lxml' if check_import('lxml') else 'html.parser'
     operations = {
         '@attr': lambda element: element.get(),
-        '$text': lambda element: element.text,
-        '$innerHTML': lambda element: element.decode_contents(),
-        '$html': lambda element: element.decode_contents(),
-        '$outerHTML': lambda element: str(element),
-        '$string': lambda element: str(element),
+        # attrgetter / methodcaller are faster than lambda
+        '$text': attrgetter('text'),
+        '$innerHTML': methodcaller('decode_contents'),
+        '$html': methodcaller('decode_contents'),
+        '$outerHTML': str,
+        '$string': str,
         '$self': return_self,
     }
 
@@ -174,17 +305,16 @@ class CSSParser(BaseParser):
             return result
         # ensure input_object is instance of BeautifulSoup
         if not isinstance(input_object, _lib.Tag):
-            if check_import('lxml'):
-                input_object = _lib.BeautifulSoup(input_object, 'lxml')
-            else:
-                input_object = _lib.BeautifulSoup(input_object, 'html.parser')
+            input_object = get_cached_soup(self, input_object)
+        items = get_css_selector(input_object, param).select(input_object)
         if value.startswith('@'):
-            result = [
-                item.get(value[1:], None) for item in input_object.select(param)
-            ]
+            attr = value[1:]
+            result = [item.get(attr, None) for item in items]
         else:
             operate = self.operations.get(value, return_self)
-            result = [operate(item) for item in input_object.select(param)]
+            # select returns a new list, no need to copy it for $self
+            result = items if operate is return_self else list(
+                map(operate, items))
         return result
 
 
@@ -209,11 +339,8 @@ class CSSSingleParser(CSSParser):
             return result
         # ensure input_object is instance of BeautifulSoup
         if not isinstance(input_object, _lib.Tag):
-            if check_import('lxml'):
-                input_object = _lib.BeautifulSoup(input_object, 'lxml')
-            else:
-                input_object = _lib.BeautifulSoup(input_object, 'html.parser')
-        item = input_object.select_one(param)
+            input_object = get_cached_soup(self, input_object)
+        item = get_css_selector(input_object, param).select_one(input_object)
         if item is None:
             return None
         if value.startswith('@'):
@@ -255,27 +382,29 @@ class SelectolaxParser(BaseParser):
             ['<a class="url" href="/">title</a>', 'a.url', '$self']      => [<a class="url" href="/">title</a>]
             ['<div>a <b>b</b> c</div>', 'div', '$html']                  => ['a <b>b</b> c']
             ['<div>a <b>b</b> c</div>', 'div', '$innerHTML']             => ['a <b>b</b> c']
-            WARNING: $self returns the original Node object
+            WARNING: $self returns the original Node object, which is shared by the rules of the same CrawlerRule if GlobalConfig.SHARE_PARSE_CACHE
     """
     name = 'selectolax'
     doc_url = 'https://github.com/rushter/selectolax'
     installed = check_import('selectolax')
 
     def get_inner_html(element):
+        # Node has no inner_html, join the html of children
         result = []
+        append = result.append
         element = element.child
-        while element:
-            result.append(element.html)
+        while element is not None:
+            append(element.html)
             element = element.next
         return ''.join(result)
 
     operations = {
         '@attr': lambda element: element.attributes.get(...),
-        '$text': lambda element: element.text(),
+        '$text': methodcaller('text'),
         '$html': get_inner_html,
         '$innerHTML': get_inner_html,
-        '$string': lambda element: element.html,
-        '$outerHTML': lambda element: element.html,
+        '$string': attrgetter('html'),
+        '$outerHTML': attrgetter('html'),
         '$self': return_self,
     }
 
@@ -289,15 +418,20 @@ class SelectolaxParser(BaseParser):
             return result
         # ensure input_object is instance of Node
         if not isinstance(input_object, (_lib.Node, _lib.HTMLParser)):
-            input_object = _lib.HTMLParser(input_object)
+            input_object = get_cached_soup(self, input_object,
+                                           _lib.HTMLParser)
         if value.startswith('@'):
+            attr = value[1:]
             result = [
-                item.attributes.get(value[1:], None)
+                item.attributes.get(attr, None)
                 for item in input_object.css(param)
             ]
         else:
             operate = self.operations.get(value, return_self)
-            result = [operate(item) for item in input_object.css(param)]
+            items = input_object.css(param)
+            # css returns a new list, no need to copy it for $self
+            result = items if operate is return_self else list(
+                map(operate, items))
         return result
 
 
@@ -322,7 +456,8 @@ class SelectolaxSingleParser(SelectolaxParser):
             return result
         # ensure input_object is instance of Node
         if not isinstance(input_object, (_lib.Node, _lib.HTMLParser)):
-            input_object = _lib.HTMLParser(input_object)
+            input_object = get_cached_soup(self, input_object,
+                                           _lib.HTMLParser)
         item = input_object.css_first(param)
         if item is None:
             return ''
@@ -361,16 +496,17 @@ class XMLParser(BaseParser):
         examples:
 
             ['<dc:creator><![CDATA[author]]></dc:creator>', 'creator', '$text']      => ['author']
-            WARNING: $self returns the original Tag object
+            WARNING: $self returns the original Tag object, which is shared by the rules of the same CrawlerRule if GlobalConfig.SHARE_PARSE_CACHE
     """
     name = 'xml'
     doc_url = 'https://developer.mozilla.org/en-US/docs/Web/CSS/CSS_Selectors'
     installed = check_import('lxml') and check_import('bs4')
+    features = 'lxml-xml'
     operations = {
         '@attr': lambda element: element.get(),
-        '$text': lambda element: element.text,
-        '$innerXML': lambda element: element.decode_contents(),
-        '$outerXML': lambda element: str(element),
+        '$text': attrgetter('text'),
+        '$innerXML': methodcaller('decode_contents'),
+        '$outerXML': str,
         '$self': return_self,
     }
 
@@ -384,14 +520,16 @@ class XMLParser(BaseParser):
             return result
         # ensure input_object is instance of BeautifulSoup
         if not isinstance(input_object, _lib.Tag):
-            input_object = _lib.BeautifulSoup(input_object, 'lxml-xml')
+            input_object = get_cached_soup(self, input_object)
+        items = get_css_selector(input_object, param).select(input_object)
         if value.startswith('@'):
-            result = [
-                item.get(value[1:], None) for item in input_object.select(param)
-            ]
+            attr = value[1:]
+            result = [item.get(attr, None) for item in items]
         else:
             operate = self.operations.get(value, return_self)
-            result = [operate(item) for item in input_object.select(param)]
+            # select returns a new list, no need to copy it for $self
+            result = items if operate is return_self else list(
+                map(operate, items))
         return result
 
 
@@ -441,34 +579,65 @@ class RegexParser(BaseParser):
     doc_url = 'https://docs.microsoft.com/en-us/dotnet/standard/base-types/regular-expression-language-quick-reference'
     VALID_VALUE_PATTERN = re_compile(r'^@|^\$\d+|^-$|^#\d+')
 
-    def _parse(self, input_object, param, value):
-        msg = f'input_object type should be str, but given {repr(input_object)[:30]}'
-        assert isinstance(input_object, str), ValueError(msg)
-        assert self.VALID_VALUE_PATTERN.match(value) or not value, ValueError(
-            r'args1 should match ^@|^\$\d+|^-$|^#\d+')
-        com = re_compile(param)
+    @staticmethod
+    @lru_cache(maxsize=1024)
+    def get_operation(param, value):
+        """Return the function to parse a str input_object with the given param & value, cached for the same args."""
+        com = getattr(param, 'code', None) or compile_regex(param)
         if not value:
-            return com.findall(input_object)
+            return com.findall
+        # same as VALID_VALUE_PATTERN, but checking chars directly
         prefix, arg = value[0], value[1:]
         if prefix == '@':
-            return com.sub(arg, input_object)
-        elif prefix == '$':
-            result = com.finditer(input_object)
-            return [match.group(int(arg)) for match in result]
-        elif prefix == '-':
-            return com.split(input_object)
-        elif prefix == '#':
-            matched = com.search(input_object)
-            if not matched:
-                return ''
-            try:
-                if arg.isdigit():
-                    index = int(arg)
-                else:
-                    index = 1
-                return matched.group(index)
-            except IndexError:
-                return ""
+            return partial(com.sub, arg)
+        elif prefix == '$' and arg[:1].isdecimal():
+            index = int(arg)
+            if index == 0 and not com.groups:
+                # findall returns the whole matched strings if no group
+                return com.findall
+            return lambda input_object: [
+                match.group(index) for match in com.finditer(input_object)
+            ]
+        elif value == '-':
+            return com.split
+        elif prefix == '#' and arg[:1].isdecimal():
+            index = int(arg) if arg.isdigit() else 1
+
+            def search_group(input_object):
+                matched = com.search(input_object)
+                if not matched:
+                    return ''
+                try:
+                    return matched.group(index)
+                except IndexError:
+                    return ""
+
+            return search_group
+        else:
+            # same exception type as the assert of the older versions
+            raise AssertionError(
+                ValueError(r'args1 should match ^@|^\$\d+|^-$|^#\d+'))
+
+    @staticmethod
+    def check_input_object(input_object):
+        if not isinstance(input_object, str):
+            msg = f'input_object type should be str, but given {repr(input_object)[:30]}'
+            raise AssertionError(ValueError(msg))
+
+    def _parse(self, input_object, param, value):
+        self.check_input_object(input_object)
+        return self.get_operation(param, value)(input_object)
+
+    def _parse_batch(self, input_list, param, value):
+        if not input_list:
+            return []
+        check_input_object = self.check_input_object
+        operate = self.get_operation(param, value)
+        result = []
+        for input_object in input_list:
+            check_input_object(input_object)
+            result.append(operate(input_object))
+        return result
 
 
 class JSONPathParser(BaseParser):
@@ -487,6 +656,8 @@ class JSONPathParser(BaseParser):
         examples:
 
             [{'a': {'b': {'c': 1}}}, '$..c', ''] => [1]
+
+            WARNING: the object loaded from str input_object is shared by the rules of the same CrawlerRule if GlobalConfig.SHARE_PARSE_CACHE, do not modify it
     """
     name = 'jsonpath'
     doc_url = 'https://github.com/sileht/python-jsonpath-rw-ext'
@@ -494,15 +665,23 @@ class JSONPathParser(BaseParser):
     installed = check_import('jsonpath_rw_ext')
     _RECURSION_LIST = False
 
+    @staticmethod
+    @lru_cache(maxsize=1024)
+    def compile_path(param):
+        """jp_parse builds the whole AST with PLY, cache it for the same JSON path."""
+        if param.startswith('JSON.'):
+            param = '$%s' % param[4:]
+        return _lib.jp_parse(param)
+
     def _parse(self, input_object, param, value=''):
         if isinstance(input_object, str):
-            input_object = GlobalConfig.json_loads(input_object)
+            input_object = get_cached_json(self, input_object)
         value = value or '$value'
         attr_name = value[1:]
-        if param.startswith('JSON.'):
-            param = '$%s' % param[4:]
         # try get the compiled jsonpath
-        jsonpath_expr = getattr(param, 'code', _lib.jp_parse(param))
+        jsonpath_expr = getattr(param, 'code', None)
+        if jsonpath_expr is None:
+            jsonpath_expr = self.compile_path(param)
         result = [
             getattr(match, attr_name, match.value)
             for match in jsonpath_expr.find(input_object)
@@ -524,23 +703,33 @@ class ObjectPathParser(BaseParser):
         examples:
 
             [{'a': {'b': {'c': 1}}}, '$..c', ''] => [1]
+
+            WARNING: the object loaded from str input_object is shared by the rules of the same CrawlerRule if GlobalConfig.SHARE_PARSE_CACHE, do not modify it
     """
     name = 'objectpath'
     doc_url = 'http://github.com/adriank/ObjectPath'
     test_url = 'http://objectpath.org/'
     installed = check_import('objectpath')
     _RECURSION_LIST = False
-    ITER_TYPES_TUPLE = tuple(_lib.ITER_TYPES)
+    # tuple(objectpath.core.ITER_TYPES), set while parsing to avoid importing objectpath at import time
+    ITER_TYPES_TUPLE: tuple = ()
 
     def _parse(self, input_object, param, value=''):
         if isinstance(input_object, str):
-            input_object = GlobalConfig.json_loads(input_object)
+            input_object = get_cached_json(self, input_object)
         if param.startswith('JSON.'):
             param = '$%s' % param[4:]
         tree = _lib.OP_Tree(input_object)
         result = tree.execute(param)
-        # from objectpath.core import ITER_TYPES
-        if isinstance(result, self.ITER_TYPES_TUPLE):
+        # generator is the most common one
+        if result.__class__ is GeneratorType:
+            return list(result)
+        iter_types = ObjectPathParser.ITER_TYPES_TUPLE
+        if not iter_types:
+            # from objectpath.core import ITER_TYPES
+            iter_types = ObjectPathParser.ITER_TYPES_TUPLE = tuple(
+                _lib.ITER_TYPES)
+        if isinstance(result, iter_types):
             result = list(result)
         return result
 
@@ -559,6 +748,8 @@ class JMESPathParser(BaseParser):
         examples:
 
             [{'a': {'b': {'c': 1}}}, 'a.b.c', ''] => 1
+
+            WARNING: the object loaded from str input_object is shared by the rules of the same CrawlerRule if GlobalConfig.SHARE_PARSE_CACHE, do not modify it
     """
     name = 'jmespath'
     doc_url = 'https://github.com/jmespath/jmespath.py'
@@ -566,10 +757,18 @@ class JMESPathParser(BaseParser):
     installed = check_import('jmespath')
     _RECURSION_LIST = False
 
+    @staticmethod
+    @lru_cache(maxsize=1024)
+    def compile_expression(param):
+        """Compile the jmespath expression only once."""
+        return _lib.jmespath_compile(param)
+
     def _parse(self, input_object, param, value=''):
         if isinstance(input_object, str):
-            input_object = GlobalConfig.json_loads(input_object)
-        code = getattr(param, 'code', _lib.jmespath_compile(param))
+            input_object = get_cached_json(self, input_object)
+        code = getattr(param, 'code', None)
+        if code is None:
+            code = self.compile_expression(param)
         return code.search(input_object)
 
 
@@ -595,6 +794,8 @@ class UDFParser(BaseParser):
     doc_url = 'https://docs.python.org/3/'
     # able to import other libs
     _ALLOW_IMPORT = True
+    # names treated as import while _ALLOW_IMPORT is False
+    _IMPORT_NAMES = frozenset({'__import__', 'importlib', 'import_module'})
     # strict protection
     _FORBIDDEN_FUNCS = {
         "input": NotImplemented,
@@ -607,8 +808,11 @@ class UDFParser(BaseParser):
     # for udf globals, here could save some module can be used, such as: _GLOBALS_ARGS = {'requests': requests}
     _GLOBALS_ARGS = {
         'md5': md5,
-        'json_loads': GlobalConfig.json_loads,
-        'json_dumps': GlobalConfig.json_dumps,
+        # resolved while calling, GlobalConfig.json_loads / json_dumps may be set as orjson / ujson after import
+        'json_loads': lambda *args, **kwargs: GlobalConfig.json_loads(
+            *args, **kwargs),
+        'json_dumps': lambda *args, **kwargs: GlobalConfig.json_dumps(
+            *args, **kwargs),
         're': re,
         'encode_as_base64': encode_as_base64,
         'decode_as_base64': decode_as_base64,
@@ -627,6 +831,44 @@ class UDFParser(BaseParser):
         else:
             return eval
 
+    @staticmethod
+    @lru_cache(maxsize=1024)
+    def compile_code(code):
+        """Compile the source code only once, return (operator, code_object)."""
+        operator = UDFParser.get_code_mode(code)
+        return operator, compile(code, code, operator.__name__)
+
+    @staticmethod
+    @lru_cache(maxsize=1024)
+    def has_import(code):
+        """Check import statements, names of __import__ / importlib / import_module, and str / bytes constants containing `import` (like __builtins__['__' + 'import' + '__']) in the AST."""
+        try:
+            tree = ast.parse(code)
+        except SyntaxError:
+            return 'import' in code
+        import_names = UDFParser._IMPORT_NAMES
+        for node in ast.walk(tree):
+            if isinstance(node, (ast.Import, ast.ImportFrom)):
+                return True
+            if isinstance(node, ast.Name) and node.id in import_names:
+                return True
+            if isinstance(node, ast.Attribute) and node.attr in import_names:
+                return True
+            # ast.Str / ast.Bytes for python3.6 / 3.7
+            if isinstance(node, ast.Constant):
+                value = node.value
+            elif node.__class__.__name__ in {'Str', 'Bytes'}:
+                value = node.s
+            else:
+                continue
+            if isinstance(value, bytes):
+                value = value.decode('latin-1')
+            elif not isinstance(value, str):
+                continue
+            if 'import' in value:
+                return True
+        return False
+
     def _parse(self, input_object, param, value=""):
         # context could be any type, if string, will try to json.loads
         # if value is null, will use the context dict from CrawlerRule & ParseRule
@@ -637,32 +879,37 @@ class UDFParser(BaseParser):
                 context = {}
         else:
             context = value or {}
-        if not self._ALLOW_IMPORT and 'import' in param:
+        if not self._ALLOW_IMPORT and (param.has_import if isinstance(
+                param, CompiledString) else self.has_import(param)):
             raise RuntimeError(
                 'UDFParser._ALLOW_IMPORT is False, so source code should not has `import` strictly. If you really want it, set `UDFParser._ALLOW_IMPORT = True` manually'
             )
-        # obj is an alias for input_object
-        local_vars = {
+        # obj is an alias for input_object, build the globals dict in one step
+        udf_globals = {
             'input_object': input_object,
             'context': context,
             'obj': input_object,
+            **self._FORBIDDEN_FUNCS,
+            **self._GLOBALS_ARGS,
         }
-        local_vars.update(self._FORBIDDEN_FUNCS)
-        local_vars.update(self._GLOBALS_ARGS)
         context_locals = context.get('locals')
         if context_locals:
-            local_vars.update(context_locals)
+            udf_globals.update(context_locals)
         # run code
-        code = getattr(param, 'code', param)
-        if self.get_code_mode(param) is exec:
-            exec(code, local_vars, local_vars)
-            parse_function = local_vars.get('parse')
+        if isinstance(param, CompiledString):
+            operator, code = param.operator, param.code
+        else:
+            operator, code = self.compile_code(param)
+        # only one dict as globals, so `parse` function can see the same names
+        if operator is exec:
+            exec(code, udf_globals)
+            parse_function = udf_globals.get('parse')
             if not parse_function:
                 raise ValueError(
                     'UDF snippet should have a function named `parse`')
             return parse_function(input_object)
         else:
-            return eval(code, local_vars, local_vars)
+            return eval(code, udf_globals)
 
 
 class PythonParser(BaseParser):
@@ -773,7 +1020,10 @@ class PythonParser(BaseParser):
             return value or input_object
 
     def _parse(self, input_object, param, value):
-        function = self.param_functions.get(param, self._handle_others)
+        # the default bound method of get() would be created on every call
+        function = self.param_functions.get(param)
+        if function is None:
+            return self._handle_others(input_object, param, value)
         return function(input_object, param, value)
 
     def _handle_strip(self, input_object, param, value):
@@ -796,33 +1046,45 @@ class PythonParser(BaseParser):
         else:
             return value
 
+    @staticmethod
+    @lru_cache(maxsize=1024)
+    def get_template(value):
+        """Template of the value, created only once for the same value."""
+        return Template(value)
+
     def _handle_template(self, input_object, param, value):
+        template = self.get_template(value)
         if isinstance(input_object, dict):
-            return Template(value).safe_substitute(input_object=input_object,
-                                                   obj=input_object,
-                                                   **input_object)
+            return template.safe_substitute(input_object=input_object,
+                                            obj=input_object,
+                                            **input_object)
         else:
-            return Template(value).safe_substitute(input_object=input_object,
-                                                   obj=input_object)
+            return template.safe_substitute(input_object=input_object,
+                                            obj=input_object)
 
-    def _handle_getitem(self, input_object, param, value):
-        if value and (value[0], value[-1]) == ('[', ']'):
-            value = value[1:-1]
-            if ':' in value:
-                # as slice
-                start, stop = value.split(':', 1)
-                if ':' in stop:
-                    stop, step = stop.split(':')
-                else:
-                    step = None
-                start = int(start) if start else None
-                stop = int(stop) if stop else None
-                step = int(step) if step else None
-                key = slice(start, stop, step)
+    @staticmethod
+    @lru_cache(maxsize=1024)
+    def get_item_key(value):
+        """Parse the value like [1:3:2] into slice / int only once."""
+        value = value[1:-1]
+        if ':' in value:
+            # as slice
+            start, stop = value.split(':', 1)
+            if ':' in stop:
+                stop, step = stop.split(':')
             else:
-                # as index
-                key = int(value)
-            return input_object[key]
+                step = None
+            start = int(start) if start else None
+            stop = int(stop) if stop else None
+            step = int(step) if step else None
+            return slice(start, stop, step)
+        else:
+            # as index
+            return int(value)
+
+    def _handle_getitem(self, input_object, param, value):
+        if value and value[0] == '[' and value[-1] == ']':
+            return input_object[self.get_item_key(value)]
         else:
             return input_object[value]
 
@@ -853,38 +1115,41 @@ class LoaderParser(BaseParser):
 
     def __init__(self):
         self.loaders = {
-            'json': GlobalConfig.json_loads,
+            'json': lambda input_object, **kwargs: GlobalConfig.json_loads(
+                input_object, **kwargs),
             'toml': _lib.toml_loads,
             'yaml': _lib.yaml_full_load,
             'yaml_safe_load': _lib.yaml_safe_load,
             'yaml_full_load': _lib.yaml_full_load,
-            'b16decode': lambda input_object: b16decode(
-                input_object.encode(GlobalConfig.__encoding__)).decode(
-                    GlobalConfig.__encoding__),
-            'b16encode': lambda input_object: b16encode(
-                input_object.encode(GlobalConfig.__encoding__)).decode(
-                    GlobalConfig.__encoding__),
-            'b32decode': lambda input_object: b32decode(
-                input_object.encode(GlobalConfig.__encoding__)).decode(
-                    GlobalConfig.__encoding__),
-            'b32encode': lambda input_object: b32encode(
-                input_object.encode(GlobalConfig.__encoding__)).decode(
-                    GlobalConfig.__encoding__),
-            'b64decode': lambda input_object: b64decode(
-                input_object.encode(GlobalConfig.__encoding__)).decode(
-                    GlobalConfig.__encoding__),
-            'b64encode': lambda input_object: b64encode(
-                input_object.encode(GlobalConfig.__encoding__)).decode(
-                    GlobalConfig.__encoding__),
-            'b85decode': lambda input_object: b85decode(
-                input_object.encode(GlobalConfig.__encoding__)).decode(
-                    GlobalConfig.__encoding__),
-            'b85encode': lambda input_object: b85encode(
-                input_object.encode(GlobalConfig.__encoding__)).decode(
-                    GlobalConfig.__encoding__),
+            'b16decode': self.str_codec(b16decode),
+            'b16encode': self.str_codec(b16encode),
+            'b32decode': self.str_codec(b32decode),
+            'b32encode': self.str_codec(b32encode),
+            'b64decode': self.str_codec(b64decode),
+            'b64encode': self.str_codec(b64encode),
+            'b85decode': self.str_codec(b85decode),
+            'b85encode': self.str_codec(b85encode),
         }
         super().__init__()
 
+    @staticmethod
+    @lru_cache(maxsize=1024)
+    def get_kwargs(value):
+        """json_loads the kwargs of the value only once, the dict will be unpacked by ** so it is not mutated."""
+        return GlobalConfig.json_loads(value)
+
+    @staticmethod
+    def str_codec(function):
+        """Wrap the bytes to bytes function (like b64encode) as str to str, bytes input_object will not be encoded again."""
+
+        def codec(input_object):
+            encoding = GlobalConfig.__encoding__
+            if isinstance(input_object, str):
+                input_object = input_object.encode(encoding)
+            return function(input_object).decode(encoding)
+
+        return codec
+
     @property
     def doc(self):
         return f'{self.__class__.__doc__}\n\nvalid param args: {list(self.loaders.keys())}\n\n{self.doc_url}\n\n{self.test_url}'
@@ -893,7 +1158,7 @@ class LoaderParser(BaseParser):
         loader = self.loaders.get(param, return_self)
         if value:
             try:
-                kwargs = GlobalConfig.json_loads(value)
+                kwargs = self.get_kwargs(value)
                 return loader(input_object, **kwargs)
             except GlobalConfig.JSONDecodeError as err:
                 return err
@@ -924,34 +1189,93 @@ class TimeParser(BaseParser):
     WARNING: time.struct_time do not have timezone info, so %z is always the local timezone
     """
     name = 'time'
-    match_int_float = re_compile(r'^-?\d+(\.\d+)?$')
+    DEFAULT_FORMAT = "%Y-%m-%d %H:%M:%S"
+    # formats encoded without the pure-python strptime, regex of (year, month, day, hour, minute, second)
+    _FAST_FORMATS = {
+        DEFAULT_FORMAT:
+            re_compile(r'([0-9]{4})-([0-9]{2})-([0-9]{2}) '
+                       r'([0-9]{2}):([0-9]{2}):([0-9]{2})'),
+        '%Y-%m-%dT%H:%M:%S':
+            re_compile(r'([0-9]{4})-([0-9]{2})-([0-9]{2})T'
+                       r'([0-9]{2}):([0-9]{2}):([0-9]{2})'),
+    }
+    _DAYS_IN_MONTH = (31, 28, 31, 30, 31, 30, 31, 31, 30, 31, 30, 31)
     # EAST8 = +8, WEST8 = -8
     _OS_LOCAL_TIME_ZONE: int = -int(timezone / 3600)
     LOCAL_TIME_ZONE: int = _OS_LOCAL_TIME_ZONE
 
+    def __init__(self):
+        # (LOCAL_TIME_ZONE, tz_fix_seconds), recomputed only if LOCAL_TIME_ZONE changed
+        self._tz_fix_cache = (None, 0)
+
     @property
     def doc(self):
         return f'{self.__class__.__doc__}\n\n_OS_LOCAL_TIME_ZONE: {self._OS_LOCAL_TIME_ZONE}\nLOCAL_TIME_ZONE: {self.LOCAL_TIME_ZONE}\n\n{self.doc_url}\n\n{self.test_url}'
 
+    def get_tz_fix_seconds(self):
+        """Seconds between LOCAL_TIME_ZONE and _OS_LOCAL_TIME_ZONE, recomputed only if LOCAL_TIME_ZONE changed."""
+        time_zone, tz_fix_seconds = self._tz_fix_cache
+        if time_zone != self.LOCAL_TIME_ZONE:
+            time_zone = self.LOCAL_TIME_ZONE
+            tz_fix_seconds = (time_zone - self._OS_LOCAL_TIME_ZONE) * 3600
+            self._tz_fix_cache = (time_zone, tz_fix_seconds)
+        return tz_fix_seconds
+
+    def _handle_encode(self, input_object, value, tz_fix_seconds):
+        # time string => timestamp
+        if '%z' in value:
+            msg = 'TimeParser Warning: time.struct_time do not have timezone info, so %z is nonsense'
+            logger.warning(msg)
+        fast_pattern = self._FAST_FORMATS.get(value)
+        if fast_pattern is not None and isinstance(input_object, str):
+            matched = fast_pattern.fullmatch(input_object)
+            if matched:
+                year, month, day, hour, minute, second = map(
+                    int, matched.groups())
+                # invalid values (and leap day) fall back to strptime for the same result / ValueError
+                days = self._DAYS_IN_MONTH[month - 1] if 0 < month < 13 else 0
+                valid_time = (year >= 1 and hour < 24 and minute < 60 and
+                              second < 60)
+                if valid_time and 0 < day <= days:
+                    return mktime((year, month, day, hour, minute, second, 0,
+                                   1, -1)) - tz_fix_seconds
+        return mktime(strptime(input_object, value)) - tz_fix_seconds
+
+    def _handle_decode(self, input_object, value, tz_fix_seconds):
+        # int / float timestamp need no check
+        if isinstance(input_object, str):
+            # float() is cheaper than checking the chars for number strings
+            try:
+                input_object = float(input_object)
+            except ValueError:
+                pass
+        # timestamp => time string
+        return strftime(value, localtime(input_object + tz_fix_seconds))
+
     def _parse(self, input_object, param, value):
-        value = value or "%Y-%m-%d %H:%M:%S"
-        tz_fix_hours = self.LOCAL_TIME_ZONE - self._OS_LOCAL_TIME_ZONE
-        tz_fix_seconds = tz_fix_hours * 3600
         if param == 'encode':
-            # time string => timestamp
-            if '%z' in value:
-                msg = 'TimeParser Warning: time.struct_time do not have timezone info, so %z is nonsense'
-                logger.warning(msg)
-            return mktime(strptime(input_object, value)) - tz_fix_seconds
+            return self._handle_encode(input_object, value or
+                                       self.DEFAULT_FORMAT,
+                                       self.get_tz_fix_seconds())
         elif param == 'decode':
-            if isinstance(input_object,
-                          str) and self.match_int_float.match(input_object):
-                input_object = float(input_object)
-            # timestamp => time string
-            return strftime(value, localtime(input_object + tz_fix_seconds))
+            return self._handle_decode(input_object, value or
+                                       self.DEFAULT_FORMAT,
+                                       self.get_tz_fix_seconds())
         else:
             return input_object
 
+    def _parse_batch(self, input_list, param, value):
+        # resolve the format and timezone only once for the whole list
+        if param == 'encode':
+            function = self._handle_encode
+        elif param == 'decode':
+            function = self._handle_decode
+        else:
+            return list(input_list)
+        value = value or self.DEFAULT_FORMAT
+        tz_fix_seconds = self.get_tz_fix_seconds()
+        return [function(item, value, tz_fix_seconds) for item in input_list]
+
 
 class ContextParser(BaseParser):
     """Return a value from input_object with given key(param), input_object often be set with context dict.
@@ -976,8 +1300,8 @@ class ContextParser(BaseParser):
 
 
 class CompiledString(str):
-    __slots__ = ('operator', 'code')
-    __support__ = ('jmespath', 'jsonpath', 'udf')
+    __slots__ = ('operator', 'code', 'has_import')
+    __support__ = ('jmespath', 'jsonpath', 'udf', 're')
 
     def __new__(cls, string, mode=None, *args, **kwargs):
         if isinstance(string, cls):
@@ -991,13 +1315,19 @@ class CompiledString(str):
         if mode == 'jmespath':
             if string.startswith('JSON.'):
                 string = string[5:]
-            obj.code = _lib.jmespath_compile(string)
+            obj.code = JMESPathParser.compile_expression(string)
         elif mode == 'jsonpath':
-            obj.code = _lib.jp_parse(string)
+            obj.code = JSONPathParser.compile_path(string)
         elif mode == 'udf':
-            obj.operator = UDFParser.get_code_mode(string)
             # for higher performance, pre-compile the code
-            obj.code = compile(string, string, obj.operator.__name__)
+            obj.operator, obj.code = UDFParser.compile_code(string)
+            obj.has_import = UDFParser.has_import(string)
+        elif mode == 're':
+            try:
+                obj.code = compile_regex(string)
+            except re.error:
+                # raise the error while parsing, same as the not compiled
+                obj.code = None
         return obj
 
 
@@ -1005,8 +1335,7 @@ class JsonSerializable(dict):
     __slots__ = ()
 
     def __init__(self, **kwargs):
-        super().__init__()
-        self.update(kwargs)
+        super().__init__(kwargs)
 
     def to_dict(self):
         return dict(self)
@@ -1069,12 +1398,22 @@ class ParseRule(JsonSerializable):
 
     @staticmethod
     def compile_rule(chain_rule):
+        if isinstance(chain_rule, list) and chain_rule[0].__class__ is str:
+            # interned parser name hits the identity check of dict lookup in parse_chain
+            chain_rule[0] = intern(chain_rule[0])
         if isinstance(chain_rule[1], CompiledString):
             return chain_rule
         if chain_rule[0] in CompiledString.__support__:
-            chain_rule[1] = CompiledString(chain_rule[1], mode=chain_rule[0])
+            chain_rule[1] = ParseRule.get_compiled_string(
+                chain_rule[1], chain_rule[0])
         return chain_rule
 
+    @staticmethod
+    @lru_cache(maxsize=4096)
+    def get_compiled_string(string, mode):
+        """CompiledString is immutable, so the rules loaded again can share the same one."""
+        return CompiledString(string, mode=mode)
+
     def compile_codes(self, chain_rules):
         return [self.compile_rule(chain_rule) for chain_rule in chain_rules]
 
@@ -1128,7 +1467,8 @@ class CrawlerRule(JsonSerializable):
     Parse Result like:
         {'crawler_rule': {'parse_rule': {'rule1': {'rule2': 'od sihT', 'rule3': {'rule4': 'This do'}}}}}
     """
-    __slots__ = ('context',)
+    # _compiled_regex: (regex, compiled_regex) cache, recompile if the regex changed
+    __slots__ = ('context', '_compiled_regex')
     CHECK_STRATEGY = 'match'
 
     def __init__(self,
@@ -1141,6 +1481,7 @@ class CrawlerRule(JsonSerializable):
         _request_args: dict = ensure_request(request_args)
         self.context = GlobalConfig.init_context(
         ) if context is None else context
+        self._compiled_regex = None
         parse_rules = [
             ParseRule(context=self.context, **parse_rule)
             for parse_rule in parse_rules or []
@@ -1154,10 +1495,10 @@ class CrawlerRule(JsonSerializable):
     def get_request(self, **request):
         if not request:
             return self['request_args']
-        # deepcopy avoid headers pollution
-        for k, v in deepcopy(self['request_args']).items():
+        # deepcopy avoid headers pollution, only copy the missing values
+        for k, v in self['request_args'].items():
             if k not in request:
-                request[k] = v
+                request[k] = deepcopy(v)
         return request
 
     def add_parse_rule(self, rule: ParseRule, context: dict = None):
@@ -1173,34 +1514,131 @@ class CrawlerRule(JsonSerializable):
     def clear_parse_rules(self):
         self['parse_rules'].clear()
 
+    def get_compiled_regex(self):
+        """Return the compiled self['regex'], None for null regex."""
+        regex = self['regex']
+        cache = self._compiled_regex
+        if cache is None or cache[0] != regex:
+            cache = self._compiled_regex = (regex, compile_regex(regex)
+                                            if regex else None)
+        return cache[1]
+
     def search(self, url):
-        return not self['regex'] or re_compile(self['regex']).search(url)
+        compiled = self.get_compiled_regex()
+        return compiled is None or compiled.search(url)
 
     def match(self, url):
-        return not self['regex'] or re_compile(self['regex']).match(url)
+        compiled = self.get_compiled_regex()
+        return compiled is None or compiled.match(url)
 
     def check_regex(self, url, strategy=''):
         return getattr(self, strategy or self.CHECK_STRATEGY)(url)
 
 
 class HostRule(JsonSerializable):
-    __slots__ = ()
+    # (regexes, (combined_pattern, rules, compiled_regexes)) cache of the crawler_rules' regex, None means need to rebuild
+    __slots__ = ('_combined_regex',)
+    # group name prefix for each regex in the combined pattern
+    COMBINED_GROUP_PREFIX = '_uniparser_rule_'
+    # numbered backreferences / conditions can not be combined, group index will shift
+    GROUP_REFERENCE_PATTERN = re_compile(r'\\\d|\(\?P=|\(\?\(')
 
     def __init__(self,
                  host: str,
                  crawler_rules: Dict[str, CrawlerRule] = None,
                  **kwargs):
+        self._combined_regex = None
         crawler_rules = {
             crawler_rule['name']: CrawlerRule(**crawler_rule)
             for crawler_rule in (crawler_rules or {}).values()
         }
         super().__init__(host=host, crawler_rules=crawler_rules, **kwargs)
 
+    def get_combined_regex(self):
+        """Combine the regex of all the crawler_rules into one alternation pattern, to check a url with one scan.
+        Returns (pattern, rules, compiled_regexes):
+            pattern will be None if some regex can not be combined safely.
+            compiled_regexes is the list of compiled regex for each rule (None for null regex), to check the rules one by one without touching the rule dicts.
+            compiled_regexes will be None if some regex is invalid, then the rules will raise the re.error while checking.
+
+        The cache is rebuilt if the crawler_rules or their regex changed, even by editing the dicts directly."""
+        crawler_rules = self['crawler_rules']
+        cache = self._combined_regex
+        if cache is not None:
+            regexes, result = cache
+            rules = result[1]
+            if len(rules) == len(crawler_rules) and all(
+                    rule is cached_rule and rule['regex'] == regex
+                    for rule, cached_rule, regex in zip(
+                        crawler_rules.values(), rules, regexes)):
+                return result
+        rules = list(crawler_rules.values())
+        raw_regexes = tuple(rule['regex'] for rule in rules)
+        regexes = [regex or '' for regex in raw_regexes]
+        combined = None
+        try:
+            compiled_regexes = [
+                rule.get_compiled_regex() for rule in rules
+            ]
+        except re.error:
+            compiled_regexes = None
+        if compiled_regexes:
+            patterns = []
+            for index, (regex, compiled) in enumerate(
+                    zip(regexes, compiled_regexes)):
+                if compiled is not None and (
+                        compiled.flags != re.UNICODE or
+                    (compiled.groups and
+                     self.GROUP_REFERENCE_PATTERN.search(regex))):
+                    # global inline flags or group references
+                    break
+                patterns.append(
+                    f'(?P<{self.COMBINED_GROUP_PREFIX}{index}>{regex})')
+            else:
+                try:
+                    combined = re_compile('|'.join(patterns))
+                except re.error:
+                    # such as the same group name in different regex
+                    combined = None
+        result = (combined, rules, compiled_regexes)
+        self._combined_regex = (raw_regexes, result)
+        return result
+
     def findall(self, url, strategy=''):
         # find all the rules which matched the given URL, strategy could be: match, search, findall
+        # sub classes of CrawlerRule may have their own CHECK_STRATEGY / match / search / check_regex
+        if any(type(rule) is not CrawlerRule
+               for rule in self['crawler_rules'].values()):
+            return [
+                rule for rule in self['crawler_rules'].values()
+                if rule.check_regex(url, strategy)
+            ]
+        strategy = strategy or CrawlerRule.CHECK_STRATEGY
+        if strategy not in {'match', 'search'}:
+            return [
+                rule for rule in self['crawler_rules'].values()
+                if rule.check_regex(url, strategy)
+            ]
+        # rebuilt by get_combined_regex if the crawler_rules changed, never a stale snapshot
+        combined, rules, compiled_regexes = self.get_combined_regex()
+        if compiled_regexes is None:
+            # some regex is invalid, raise the error as the rule checking
+            return [rule for rule in rules if rule.check_regex(url, strategy)]
+        start = 0
+        if combined is not None:
+            matched = getattr(combined, strategy)(url)
+            if not matched:
+                # none of the rules matched
+                return []
+            if strategy == 'match':
+                # the alternatives are tried in order at the same position,
+                # so the rules before the matched one can be skipped
+                start = int(matched.lastgroup[len(self.COMBINED_GROUP_PREFIX):])
         return [
-            rule for rule in self['crawler_rules'].values()
-            if rule.check_regex(url, strategy)
+            rules[index]
+            for index in range(start, len(rules))
+            if compiled_regexes[index] is None or
+            getattr(compiled_regexes[index], strategy)(url)
         ]
 
     def find(self, url, strategy=''):
@@ -1221,6 +1659,7 @@ class HostRule(JsonSerializable):
         if not isinstance(rule, CrawlerRule) and isinstance(rule, str):
             rule = CrawlerRule.loads(rule)
         self['crawler_rules'][rule['name']] = rule
+        self._combined_regex = None
         try:
             assert get_host(rule['request_args']['url']) == self[
                 'host'], f'different host: {self["host"]} not match {rule["request_args"]["url"]}'
@@ -1228,10 +1667,11 @@ class HostRule(JsonSerializable):
                 rule['request_args']['url']
             ), f'regex {rule["regex"]} not match the given url: {rule["request_args"]["url"]}'
         except (ValueError, KeyError, AssertionError) as e:
-            self['crawler_rules'].pop(rule['name'], None)
+            self.pop_crawler_rule(rule['name'])
             raise e
 
     def pop_crawler_rule(self, rule_name: str):
+        self._combined_regex = None
         return self['crawler_rules'].pop(rule_name, None)
 
 
@@ -1239,6 +1679,12 @@ class Uniparser(object):
     """Parsers collection.
     """
     _RECURSION_CRAWL = True
+    # parse_parse_rule is not overwritten, child rules can skip its wrapper dict
+    _DIRECT_PARSE_RULE = True
+
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        cls._DIRECT_PARSE_RULE = cls.parse_parse_rule is Uniparser.parse_parse_rule
 
     def __init__(self,
                  request_adapter: Union[AsyncRequestAdapter,
@@ -1305,8 +1751,11 @@ class Uniparser(object):
                     chain_rules: List,
                     context: dict = None):
         context = GlobalConfig.init_context() if context is None else context
+        # parsers are saved in instance __dict__, skip the getattr for each step
+        get_parser = self.__dict__.get
         for parser_name, param, value in chain_rules:
-            parser: BaseParser = getattr(self, parser_name)
+            parser: BaseParser = get_parser(parser_name) or getattr(
+                self, parser_name, None)
             if parser is None:
                 msg = f'Unknown parser name: {parser_name}'
                 logger.error(msg)
@@ -1327,44 +1776,62 @@ class Uniparser(object):
         context.setdefault('req', context['request_args'])
         context['parse_result'] = parse_result
         _input_object = input_object
-        for parse_rule in parse_rules:
-            temp_result = self.parse_parse_rule(_input_object, parse_rule,
-                                                context).get(parse_rule['name'])
-            if parse_rule['name'] == GlobalConfig.__object__:
-                _input_object = temp_result
-            parse_result[parse_rule['name']] = temp_result
+        # rules of this CrawlerRule share the soups / JSON objects of the same input_object
+        opened = open_parse_cache()
+        try:
+            for parse_rule in parse_rules:
+                name = parse_rule['name']
+                temp_result = self.get_parse_rule_value(
+                    _input_object, parse_rule, context)
+                if name == GlobalConfig.__object__:
+                    _input_object = temp_result
+                parse_result[name] = temp_result
+        finally:
+            close_parse_cache(opened)
         context.pop('parse_result', None)
         return {rule['name']: parse_result}
 
-    def parse_parse_rule(self, input_object, rule: ParseRule, context=None):
-        # if context, use context; else use rule.context
-        context = rule.context if context is None else context
+    def get_parse_rule_value(self,
+                             input_object,
+                             rule: ParseRule,
+                             context=None):
+        """Same as parse_parse_rule(...).get(rule['name']), but skip the wrapper dict if no parse_callback."""
+        if self.parse_callback or not self._DIRECT_PARSE_RULE:
+            return self.parse_parse_rule(input_object, rule,
+                                         context=context).get(rule['name'])
+        return self._parse_rule_value(
+            input_object, rule, rule.context if context is None else context)
+
+    def _parse_rule_value(self, input_object, rule: ParseRule, context):
         input_object = self.parse_chain(input_object,
                                         rule['chain_rules'],
                                         context=context)
         if rule['name'] == GlobalConfig.__schema__ and input_object is not True:
             raise InvalidSchemaError(
                 f'Schema check is not True: {repr(input_object)[:50]}')
-        if rule['child_rules']:
-            result: Dict[str, Any] = {rule['name']: {}}
-            if rule.get('iter_parse_child', False):
-                result[rule['name']] = []
-                for partial_input_object in input_object:
-                    partial_result = {}
-                    for sub_rule in rule['child_rules']:
-                        partial_result[
-                            sub_rule['name']] = self.parse_parse_rule(
-                                partial_input_object, sub_rule,
-                                context=context).get(sub_rule['name'])
-                    result[rule['name']].append(partial_result)
-            else:
-                for sub_rule in rule['child_rules']:
-                    result[rule['name']][
-                        sub_rule['name']] = self.parse_parse_rule(
-                            input_object, sub_rule,
-                            context=context).get(sub_rule['name'])
+        child_rules = rule['child_rules']
+        if not child_rules:
+            return input_object
+        get_parse_rule_value = self.get_parse_rule_value
+        if rule.get('iter_parse_child', False):
+            return [{
+                sub_rule['name']: get_parse_rule_value(
+                    partial_input_object, sub_rule, context=context)
+                for sub_rule in child_rules
+            } for partial_input_object in input_object]
         else:
-            result = {rule['name']: input_object}
+            return {
+                sub_rule['name']: get_parse_rule_value(
+                    input_object, sub_rule, context=context)
+                for sub_rule in child_rules
+            }
+
+    def parse_parse_rule(self, input_object, rule: ParseRule, context=None):
+        # if context, use context; else use rule.context
+        context = rule.context if context is None else context
+        result: Dict[str, Any] = {
+            rule['name']: self._parse_rule_value(input_object, rule, context)
+        }
         if self.parse_callback:
             return self.parse_callback(rule, result, context)
         return result
@@ -1402,12 +1869,17 @@ class Uniparser(object):
         context.setdefault('req', context['request_args'])
         context['parse_result'] = parse_result
         _input_object = input_object
-        for parse_rule in parse_rules:
-            temp_result = (await self.aparse_parse_rule(
-                _input_object, parse_rule, context)).get(parse_rule['name'])
-            if parse_rule['name'] == GlobalConfig.__object__:
-                _input_object = temp_result
-            parse_result[parse_rule['name']] = temp_result
+        opened = open_parse_cache()
+        try:
+            for parse_rule in parse_rules:
+                temp_result = (await self.aparse_parse_rule(
+                    _input_object, parse_rule,
+                    context)).get(parse_rule['name'])
+                if parse_rule['name'] == GlobalConfig.__object__:
+                    _input_object = temp_result
+                parse_result[parse_rule['name']] = temp_result
+        finally:
+            close_parse_cache(opened)
         context.pop('parse_result', None)
         return {rule['name']: parse_result}
 
@@ -1428,25 +1900,19 @@ class Uniparser(object):
         if rule['name'] == GlobalConfig.__schema__ and input_object is not True:
             raise InvalidSchemaError(
                 f'Schema check is not True: {repr(input_object)[:50]}')
-        if rule['child_rules']:
-            result: Dict[str, Any] = {rule['name']: {}}
+        child_rules = rule['child_rules']
+        if child_rules:
+            result: Dict[str, Any] = {}
             if rule.get('iter_parse_child', False):
-                result[rule['name']] = []
-                for partial_input_object in input_object:
-                    partial_result = {}
-                    for sub_rule in rule['child_rules']:
-                        temp_result = await self.aparse_parse_rule(
-                            partial_input_object, sub_rule, context=context)
-                        partial_result[sub_rule['name']] = temp_result.get(
-                            sub_rule['name'])
-                    result[rule['name']].append(partial_result)
+                # sequentially, the partial input objects share the context
+                result[rule['name']] = [
+                    await self._aparse_child_rules(partial_input_object,
+                                                   child_rules, context)
+                    for partial_input_object in input_object
+                ]
             else:
-                for sub_rule in rule['child_rules']:
-                    temp_result = await self.aparse_parse_rule(input_object,
-                                                               sub_rule,
-                                                               context=context)
-                    result[rule['name']][sub_rule['name']] = temp_result.get(
-                        sub_rule['name'])
+                result[rule['name']] = await self._aparse_child_rules(
+                    input_object, child_rules, context)
         else:
             result = {rule['name']: input_object}
         if self.parse_callback:
@@ -1458,6 +1924,15 @@ class Uniparser(object):
             return await coro
         return result
 
+    async def _aparse_child_rules(self, input_object, child_rules, context):
+        result = {}
+        for sub_rule in child_rules:
+            temp_result = await self.aparse_parse_rule(input_object,
+                                                       sub_rule,
+                                                       context=context)
+            result[sub_rule['name']] = temp_result.get(sub_rule['name'])
+        return result
+
     async def aparse(self,
                      input_object,
                      rule_object: Union[CrawlerRule, ParseRule],
@@ -1492,6 +1967,14 @@ class Uniparser(object):
             self.request_adapter = get_available_async_request()()
         return self.request_adapter
 
+    async def aclose(self):
+        """Close the session kept by the async request_adapter, which is reused by all the acrawl calls."""
+        if isinstance(self.request_adapter, AsyncRequestAdapter) and hasattr(
+                self.request_adapter, 'close'):
+            await self.request_adapter.close()
+            # ensure_adapter will create a new one for the next request
+            self.request_adapter = None
+
     def download(self,
                  crawler_rule: CrawlerRule = None,
                  request_adapter=None,
@@ -1577,6 +2060,31 @@ class Uniparser(object):
         context['request_args'] = request_args
         return await self.aparse(input_object, crawler_rule, context)
 
+    async def acrawl_many(self,
+                          crawler_rules: List[Union[CrawlerRule, tuple]],
+                          request_adapter=None,
+                          concurrency=32):
+        """Crawl the rules concurrently with one request_adapter, limited by concurrency.
+        Each item could be a CrawlerRule, or a tuple of (CrawlerRule, request_kwargs) to crawl one rule with different requests, like (rule, {'url': url}).
+        Each item is crawled with its own context, so the same rule can be repeated.
+        Return the results in the same order, exceptions will be returned instead of raised."""
+        request_adapter = request_adapter or self.ensure_adapter(sync=False)
+        semaphore = asyncio.Semaphore(concurrency)
+
+        async def acrawl_one(item):
+            if isinstance(item, CrawlerRule):
+                crawler_rule, request = item, {}
+            else:
+                crawler_rule, request = item
+            async with semaphore:
+                return await self.acrawl(crawler_rule, request_adapter,
+                                         GlobalConfig.init_context(),
+                                         **request)
+
+        return await asyncio.gather(
+            *[acrawl_one(item) for item in crawler_rules],
+            return_exceptions=True)
+
     def set_frequency(self, host_or_url: str, n=0, interval=0):
         host = get_host(host_or_url, host_or_url)
         self._HOST_FREQUENCIES[host] = _lib.Frequency(n, interval)
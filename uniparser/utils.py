@@ -380,16 +380,24 @@ class HTTPXAsyncAdapter(AsyncRequestAdapter):
     def __init__(self, session=None, **kwargs):
         from httpx import AsyncClient, HTTPError
         self.session = session
-        self.session_class = AsyncClient(**kwargs)
+        self.session_class = partial(AsyncClient, **kwargs)
         self.error = (HTTPError, InvalidSchemaError)
 
     async def __aenter__(self):
-        if not self.session:
-            self.session = await self.session_class.__aenter__()
+        if not self.session or self.session.is_closed:
+            self.session = await self.session_class().__aenter__()
         return self
 
     async def __aexit__(self, *args):
-        await self.session.aclose()
+        # keep the connection pool for the next request, same as AiohttpAsyncAdapter
+        pass
+
+    async def close(self):
+        if self.session and not self.session.is_closed:
+            await self.session.aclose()
+
+    def __del__(self, *args):
+        _exhaust_simple_coro(self.close())
 
 
 class AiohttpAsyncAdapter(AsyncRequestAdapter):
@@ -403,7 +411,7 @@ class AiohttpAsyncAdapter(AsyncRequestAdapter):
         self.BasicAuth, self.ClientTimeout = BasicAuth, ClientTimeout
 
     async def __aenter__(self):
-        if not self.session:
+        if not self.session or self.session.closed:
             self.session = self.session_class()
         return self
 
@@ -730,6 +738,9 @@ _lib.register('from jmespath import compile as jmespath_compile',
 _lib.register('from jsonpath_rw_ext import parse as jp_parse', 'jp_parse')
 _lib.register('from toml import loads as toml_loads', 'toml_loads')
 _lib.register('from bs4 import BeautifulSoup, Tag', ('BeautifulSoup', 'Tag'))
+_lib.register('from bs4.builder import builder_registry', 'builder_registry')
+_lib.register('from soupsieve import compile as soupsieve_compile',
+              'soupsieve_compile')
 _lib.register('from objectpath import Tree as OP_Tree', 'OP_Tree')
 _lib.register('from objectpath.core import ITER_TYPES', 'ITER_TYPES')
 _lib.register('from yaml import full_load as yaml_full_load', 'yaml_full_load')
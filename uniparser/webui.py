@@ -36,9 +36,9 @@ static_path = (root_path / 'static').as_posix()
 def exception_handler(exc):
     trace_id = str(int(time() * 1000))
     err_name = exc.__class__.__name__
-    err_value = str(exc)
-    msg = f'{err_name}({err_value}) trace_id: {trace_id}:\n{format_exc()}'
-    logger.error(msg)
+    # bottle has formatted the traceback as HTTPError.traceback, format_exc() is out of the except block here
+    logger.error('%s(%s) trace_id: %s:\n%s', err_name, exc, trace_id,
+                 getattr(exc, 'traceback', None))
     return f'Oops! {err_name}, trace_id: {trace_id}'
 
 